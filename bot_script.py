@@ -1,178 +1,570 @@
 import os
 import sys
 import re
+import glob
 import asyncio
 import subprocess
 from playwright.async_api import async_playwright, TimeoutError
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # --- CONFIGURATION ---
-MEETING_URL = sys.argv[1] if len(sys.argv) > 1 else ""
+MEETING_URLS = [arg for arg in sys.argv[1:] if arg]
 MAX_MEETING_DURATION_SECONDS = 10800
-OUTPUT_FILENAME = "meeting_audio.wav"
+# Per-user location: anyone who can connect to the socket can make the bot join meetings.
+SOCKET_PATH = os.path.join(os.environ.get("XDG_RUNTIME_DIR") or os.path.expanduser("~/.tldv"), "tldv_bot.sock")
+# Meetings record the shared default audio source, so the daemon runs them one at a time.
+MAX_CONCURRENT_MEETINGS = 1
+# Headed (under xvfb-run) stays the default until a real join plus PulseAudio capture is verified headless.
+HEADLESS = os.environ.get("BOT_HEADLESS") == "1"
+OUTPUT_PATTERN = "meeting_audio_%03d.ogg"
+OUTPUT_GLOB = "meeting_audio_[0-9][0-9][0-9].ogg"
+# WhisperX diarizes every segment on its own, so its speaker labels are only meaningful within one segment.
+SEGMENT_SECONDS = 300
+SEGMENT_POLL_SECONDS = 5
+# Segments waiting for WhisperX (e.g. when it falls behind real time) are sent this many at a time.
+MAX_CONCURRENT_TRANSCRIPTIONS = 3
+# Segments whose loudest sample stays below this are treated as silence and not sent to WhisperX.
+SILENCE_THRESHOLD_DB = -50.0
+PARTICIPANT_BUTTON_SELECTOR = (
+    'button[aria-label*="Show everyone"], button[aria-label*="Participants"], button[aria-label*="People"],'
+    'button[data-tooltip*="Show everyone"], button[data-tooltip*="Participants"], button[data-tooltip*="People"]'
+)
+PARTICIPANT_CHECK_MS = 1000
+# Consecutive checks without the participant button before the meeting is considered over.
+PARTICIPANT_MISSING_CHECKS = 5
 TRANSCRIPT_FILENAME = "transcript.txt"
+FFMPEG_LOG_FILENAME = "ffmpeg.log"
+RECORDER_STOP_TIMEOUT_SECONDS = 10
 WHISPERX_URL = "http://localhost:8000/v1/audio/transcriptions"
+# (connect, read) seconds; a hung WhisperX must not hold an upload slot and the meeting cleanup forever.
+WHISPERX_TIMEOUT = (10, 900)
+
+_JOIN_RE = re.compile(r"Join now|Ask to join", re.IGNORECASE)
+_COUNT_RE = re.compile(r"\d+")
+_MAX_VOLUME_RE = re.compile(r"max_volume:\s*(-?[\d.]+|-inf) dB")
+# A WhisperX line header, "[SPEAKER_xx] [start - end]", at the start of a line; bracketed ranges in speech are left alone.
+_SEGMENT_HEADER_RE = re.compile(
+    r"^\[(SPEAKER_\d+)\](?:[ \t]*\[(\d+(?:\.\d+)?)[ \t]*-[ \t]*(\d+(?:\.\d+)?)\])?", re.MULTILINE,
+)
+_SEGMENT_INDEX_RE = re.compile(r"(\d+)\.\w+$")
+
+# Runs in the page: reports the participant button's text to Python only when it changes,
+# and reports null once the button has been missing for several checks in a row.
+_PARTICIPANT_WATCHER_JS = """
+([selector, intervalMs, missingChecks]) => {
+    let lastText;
+    let misses = 0;
+    setInterval(() => {
+        const button = document.querySelector(selector);
+        if (!button) {
+            misses += 1;
+            if (misses === missingChecks) window.on_participants(null);
+            return;
+        }
+        misses = 0;
+        // Try to get aria-label first, fall back to data-tooltip
+        const text = button.getAttribute('aria-label') || button.getAttribute('data-tooltip');
+        if (text !== lastText) {
+            lastText = text;
+            window.on_participants(text);
+        }
+    }, intervalMs);
+}
+"""
 
 def get_ffmpeg_command(platform, duration):
+    # Whisper works on 16 kHz mono anyway, so encode that as Opus instead of uploading full-rate PCM.
+    encode_args = ["-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", "24k"]
+    # Record into fixed-length segments so finished ones can be transcribed while the meeting goes on.
+    output_args = encode_args + ["-f", "segment", "-segment_time", str(SEGMENT_SECONDS), "-reset_timestamps", "1", OUTPUT_PATTERN]
     if platform.startswith("linux"):
-        return ["ffmpeg", "-y", "-f", "pulse", "-i", "default", "-t", str(duration), OUTPUT_FILENAME]
+        return ["ffmpeg", "-y", "-loglevel", "error", "-nostats", "-f", "pulse", "-thread_queue_size", "1024", "-i", "default", "-t", str(duration)] + output_args
     elif platform == "darwin":
-        return ["ffmpeg", "-y", "-f", "avfoundation", "-i", ":BlackHole 2ch", "-t", str(duration), OUTPUT_FILENAME]
+        return ["ffmpeg", "-y", "-loglevel", "error", "-nostats", "-f", "avfoundation", "-thread_queue_size", "1024", "-i", ":BlackHole 2ch", "-t", str(duration)] + output_args
     return None
 
+def make_whisperx_session():
+    # POSTs are retried (allowed_methods=None) only when WhisperX cannot have started on the segment:
+    # connect errors and 503. After a read error, 502 or 504 it may still be transcribing it, so those are not retried.
+    retries = Retry(
+        total=3, read=0, backoff_factor=0.5, status_forcelist=(503,), allowed_methods=None, raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENT_TRANSCRIPTIONS, max_retries=retries)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+# Shared by every segment upload so connections to WhisperX are kept alive between requests.
+_SESSION = make_whisperx_session()
+
+class BrowserPool:
+    """One Chromium instance shared by every meeting; each meeting gets its own context."""
+
+    def __init__(self):
+        self._playwright = None
+        self._browser = None
+        self.connected = False
+
+    async def start(self):
+        print("Starting browser...")
+        self._playwright = await async_playwright().start()
+        # channel="chromium" selects new headless; plain headless=True launches chromium-headless-shell,
+        # whose HeadlessChrome user agent Google Meet rejects.
+        self._browser = await self._playwright.chromium.launch(headless=HEADLESS, channel="chromium", args=[
+            "--disable-blink-features=AutomationControlled", "--use-fake-ui-for-media-stream", "--use-fake-device-for-media-stream",
+            "--disable-gpu", "--disable-dev-shm-usage", "--disable-extensions",
+            # Only the DOM is read, so skip images. A flag rather than context.route: routing would send every
+            # request of the meeting through Python and disable the HTTP cache.
+            "--blink-settings=imagesEnabled=false",
+        ])
+        self.connected = True
+        self._browser.on("disconnected", self._on_disconnected)
+
+    def _on_disconnected(self, browser):
+        print("⚠️ Browser disconnected; a new one will be started for the next meeting.")
+        self.connected = False
+
+    async def acquire(self):
+        return await self._browser.new_context(permissions=["microphone", "camera"])
+
+    async def release(self, context):
+        if self.connected:
+            await context.close()
+
+    async def close(self):
+        if self._browser and self.connected:
+            await self._browser.close()
+        if self._playwright:
+            await self._playwright.stop()
+        print("Browser closed.")
+
+_pool = None
+_pool_lock = asyncio.Lock()
+
+async def get_pool():
+    global _pool
+    async with _pool_lock:
+        if _pool is not None and not _pool.connected:
+            # Chromium crashed or was closed; drop the dead instance instead of failing every later meeting.
+            await _pool.close()
+            _pool = None
+        if _pool is None:
+            pool = BrowserPool()
+            await pool.start()
+            _pool = pool
+    return _pool
+
+async def close_pool():
+    global _pool
+    async with _pool_lock:
+        if _pool is not None:
+            await _pool.close()
+            _pool = None
+
+async def stop_recorder(recorder):
+    # 'q' makes ffmpeg finish and close the current segment; terminate() can leave it truncated.
+    try:
+        recorder.stdin.write(b"q")
+        await recorder.stdin.drain()
+    except OSError:
+        pass
+    try:
+        await asyncio.wait_for(recorder.wait(), RECORDER_STOP_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        print("ffmpeg did not stop in time, terminating it...")
+        recorder.terminate()
+        await recorder.wait()
+
+async def wait_until_left(leave_button):
+    # Wait for the button to appear first, so a bot still waiting in the lobby is not taken as having left.
+    await leave_button.wait_for(state="attached", timeout=0)
+    await leave_button.wait_for(state="detached", timeout=0)
+
+async def wait_for_meeting_end(page, leave_button, meeting_over, max_duration):
+    def on_page_gone(_):
+        # The in-page participant watcher dies with the page, so it can no longer end the meeting itself.
+        print("The meeting page closed or crashed. Ending the recording.")
+        meeting_over.set()
+
+    page.on("crash", on_page_gone)
+    page.on("close", on_page_gone)
+    left_meeting = asyncio.create_task(wait_until_left(leave_button))
+    participants_done = asyncio.create_task(meeting_over.wait())
+    watchers = {left_meeting, participants_done}
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_duration
+    try:
+        while True:
+            done, watchers = await asyncio.wait(
+                watchers, timeout=max(deadline - loop.time(), 0), return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                print("Maximum meeting duration reached. Ending the recording.")
+                return
+            if left_meeting in done:
+                error = left_meeting.exception()
+                if error is None:
+                    print("The 'Leave call' button is gone. Assuming the bot has left the meeting.")
+                    return
+                if page.is_closed() or is_target_closed(error):
+                    print(f"The meeting page is gone ({error}). Ending the recording.")
+                    return
+                # A locator error (e.g. a strict-mode violation) says nothing about the meeting;
+                # keep going on the participant count.
+                print(f"❌ Stopped watching the 'Leave call' button: {error}")
+            if participants_done in done:
+                return
+    finally:
+        for task in watchers:
+            task.cancel()
+        # Cleanup closes the page itself; that is not a crash.
+        page.remove_listener("crash", on_page_gone)
+        page.remove_listener("close", on_page_gone)
+
+def is_target_closed(error):
+    # Playwright raises TargetClosedError (older versions: a plain Error) once the page, context or browser is gone.
+    message = str(error)
+    return type(error).__name__ == "TargetClosedError" or "has been closed" in message or "Target closed" in message
+
+def transcript_filename(meeting_number):
+    if meeting_number == 1:
+        return TRANSCRIPT_FILENAME
+    root, ext = os.path.splitext(TRANSCRIPT_FILENAME)
+    return f"{root}_{meeting_number}{ext}"
+
+def list_segments():
+    return sorted(glob.glob(OUTPUT_GLOB))
+
+def remove_stale_transcript(transcript_path):
+    # A transcript from an earlier run under the same name would otherwise pass for this meeting's result.
+    if os.path.exists(transcript_path):
+        os.remove(transcript_path)
+
+def remove_old_segments():
+    # Segments left over from a longer previous run would otherwise end up in this transcript.
+    for path in list_segments():
+        os.remove(path)
+
+def is_silent(audio_path):
+    result = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-nostats", "-i", audio_path, "-af", "volumedetect", "-f", "null", "-"],
+        capture_output=True, text=True,
+    )
+    match = _MAX_VOLUME_RE.search(result.stderr)
+    if not match:
+        return False
+    return float(match.group(1)) < SILENCE_THRESHOLD_DB
+
 def transcribe_audio(audio_path):
     if not os.path.exists(audio_path):
         print(f"❌ Audio file not found at {audio_path}")
-        return
+        return None
     print(f"🎤 Sending {audio_path} to whisperx for transcription...")
     try:
         with open(audio_path, 'rb') as f:
             files = {'file': (os.path.basename(audio_path), f)}
-            response = requests.post(WHISPERX_URL, files=files)
+            response = _SESSION.post(WHISPERX_URL, files=files, timeout=WHISPERX_TIMEOUT)
         if response.status_code == 200:
             transcript_data = response.json()
-            clean_transcript = transcript_data.get('text', '').replace('<br>', '\n')
-            with open(TRANSCRIPT_FILENAME, 'w') as f:
-                f.write(clean_transcript)
-            print(f"✅ Transcription successful. Saved to {TRANSCRIPT_FILENAME}")
+            print(f"✅ Transcribed {audio_path}.")
+            return transcript_data.get('text', '').replace('<br>', '\n')
         else:
             print(f"❌ Transcription failed. Status code: {response.status_code}\n{response.text}")
     except requests.exceptions.RequestException as e:
         print(f"❌ Error connecting to whisperx service: {e}")
     except Exception as e:
         print(f"An unexpected error occurred during transcription: {e}")
+    return None
+
+def shift_time(value, offset):
+    decimals = len(value.partition(".")[2])
+    return f"{float(value) + offset:.{decimals}f}"
+
+def segment_index(path):
+    return int(_SEGMENT_INDEX_RE.search(path).group(1))
+
+def to_meeting_timeline(text, index):
+    """Shifts "[start - end]" onto the meeting timeline and prefixes speaker labels with their segment."""
+    # SPEAKER_00 in two segments is not necessarily the same person, hence SEG003_SPEAKER_00.
+    offset = index * SEGMENT_SECONDS
+
+    def rewrite(m):
+        speaker = f"[SEG{index:03d}_{m[1]}]"
+        if m[2] is None:
+            return speaker
+        return f"{speaker} [{shift_time(m[2], offset)} - {shift_time(m[3], offset)}]"
+
+    return _SEGMENT_HEADER_RE.sub(rewrite, text)
+
+async def transcribe_segment(path, semaphore):
+    async with semaphore:
+        if await asyncio.to_thread(is_silent, path):
+            print(f"🔇 Skipping silent segment {path}.")
+            return None
+        text = await asyncio.to_thread(transcribe_audio, path)
+    return to_meeting_timeline(text, segment_index(path)) if text else text
+
+async def transcribe_segments(recorder):
+    """Transcribes each finished segment while ffmpeg keeps recording; returns texts in order."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_TRANSCRIPTIONS)
+    tasks = {}
+    while True:
+        finished = recorder.returncode is not None
+        segments = list_segments()
+        # The newest segment is still being written until ffmpeg moves on to the next one or exits.
+        ready = segments if finished else segments[:-1]
+        for path in ready:
+            if path not in tasks and os.path.getsize(path) > 0:
+                tasks[path] = asyncio.create_task(transcribe_segment(path, semaphore))
+        if finished:
+            break
+        await asyncio.sleep(SEGMENT_POLL_SECONDS)
+    results = await asyncio.gather(*(tasks[path] for path in sorted(tasks)))
+    return [text for text in results if text]
 
-async def join_and_record_meeting(url: str, max_duration: int):
+def save_transcript(transcripts, transcript_path):
+    with open(transcript_path, 'w') as f:
+        f.write("\n".join(transcripts))
+    print(f"✅ Transcription successful. Saved to {transcript_path}")
+
+async def join_and_record_meeting(url: str, max_duration: int, transcript_path: str = TRANSCRIPT_FILENAME):
     ffmpeg_command = get_ffmpeg_command(sys.platform, max_duration)
     if not ffmpeg_command:
         print(f"Unsupported OS: {sys.platform}. Could not determine ffmpeg command.")
         return
 
-    print("Starting browser...")
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False, args=["--disable-blink-features=AutomationControlled", "--use-fake-ui-for-media-stream", "--use-fake-device-for-media-stream"])
-        context = await browser.new_context(permissions=["microphone", "camera"])
+    pool = await get_pool()
+    context = await pool.acquire()
+    try:
         page = await context.new_page()
-        recorder = None
+        await attend_meeting(page, url, ffmpeg_command, max_duration, transcript_path)
+    finally:
+        await pool.release(context)
+        print("Meeting context closed.")
+
+async def attend_meeting(page, url, ffmpeg_command, max_duration, transcript_path):
+    remove_stale_transcript(transcript_path)
+    # Used both to detect that the meeting has ended and to hang up during cleanup.
+    leave_button = page.get_by_role("button", name="Leave call")
+    recorder = None
+    recorder_log = None
+    transcriber = None
+
+    try:
+        print(f"Navigating to {url}...")
+        await page.goto(url, timeout=60000)
+        print("Entering a name...")
+        await page.locator('input[placeholder="Your name"]').fill("NoteTaker Bot")
 
+        # --- Turn off mic and camera BEFORE joining ---
         try:
-            print(f"Navigating to {url}...")
-            await page.goto(url, timeout=60000)
-            print("Entering a name...")
-            await page.locator('input[placeholder="Your name"]').fill("NoteTaker Bot")
+            await page.get_by_role("button", name="Turn off microphone").click(timeout=10000)
+            print("🎤 Microphone turned off before joining.")
+        except Exception:
+            print("Could not turn off microphone before joining.")
+        try:
+            await page.get_by_role("button", name="Turn off camera").click(timeout=10000)
+            print("📸 Camera turned off before joining.")
+        except Exception:
+            print("Could not turn off camera before joining.")
 
-            # --- Turn off mic and camera BEFORE joining ---
-            try:
-                await page.get_by_role("button", name="Turn off microphone").click(timeout=10000)
-                print("🎤 Microphone turned off before joining.")
-            except Exception:
-                print("Could not turn off microphone before joining.")
-            try:
-                await page.get_by_role("button", name="Turn off camera").click(timeout=10000)
-                print("📸 Camera turned off before joining.")
-            except Exception:
-                print("Could not turn off camera before joining.")
+        join_button_locator = page.get_by_role("button", name=_JOIN_RE)
+        print("Waiting for the join button...")
+        await join_button_locator.wait_for(timeout=15000)
+
+        print(f"Starting recording for a maximum of {max_duration / 3600:.1f} hours...")
+        remove_old_segments()
+        # Nothing reads ffmpeg's output while it records, so a PIPE here would fill up and stall it.
+        recorder_log = open(FFMPEG_LOG_FILENAME, "wb")
+        recorder = await asyncio.create_subprocess_exec(
+            *ffmpeg_command, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.DEVNULL, stderr=recorder_log,
+        )
+        transcriber = asyncio.create_task(transcribe_segments(recorder))
 
-            join_button_locator = page.get_by_role("button", name=re.compile("Join now|Ask to join"))
-            print("Waiting for the join button...")
-            await join_button_locator.wait_for(timeout=15000)
+        print("Clicking the join button...")
+        await join_button_locator.click(timeout=15000)
+        print("Successfully joined or requested to join.")
 
-            print(f"Starting recording for a maximum of {max_duration / 3600:.1f} hours...")
-            recorder = subprocess.Popen(ffmpeg_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            await page.get_by_role("button", name="Got it").click(timeout=15000)
+            print("✅ Closed the initial pop-up window.")
+        except TimeoutError:
+            print("Initial pop-up not found, continuing...")
 
-            print("Clicking the join button...")
-            await join_button_locator.click(timeout=15000)
-            print("Successfully joined or requested to join.")
+        print("Waiting for 10 seconds for the meeting UI to stabilize...")
+        await asyncio.sleep(10)
 
-            try:
-                await page.get_by_role("button", name="Got it").click(timeout=15000)
-                print("✅ Closed the initial pop-up window.")
-            except TimeoutError:
-                print("Initial pop-up not found, continuing...")
-
-            print("Waiting for 10 seconds for the meeting UI to stabilize...")
-            await asyncio.sleep(10)
-
-            print("Bot is now in the meeting. Monitoring participant count...")
-            check_interval_seconds = 10
-            while True:
-                await asyncio.sleep(check_interval_seconds)
+        print("Bot is now in the meeting. Monitoring participant count...")
+        meeting_over = asyncio.Event()
+        button_missing = False
+
+        def on_participants(count_text):
+            nonlocal button_missing
+            if count_text is None:
+                print("Could not find participant count button. Assuming meeting has ended.")
+                button_missing = True
+                meeting_over.set()
+                return
+
+            print(f"DEBUG: Raw attribute text: '{count_text}'")
+
+            match = _COUNT_RE.search(count_text)
+            if match:
+                participant_count = int(match.group())
+                print(f"✅ Successfully parsed participant count: [{participant_count}]")
+                if participant_count <= 1:
+                    print("Only 1 participant left. Ending the recording.")
+                    meeting_over.set()
+            else:
+                print(f"❌ Could not parse participant count from text: '{count_text}'")
+                meeting_over.set()
+
+        try:
+            # The page reports the participant button text only when it changes, so Python just waits.
+            await page.expose_function("on_participants", on_participants)
+            await page.evaluate(_PARTICIPANT_WATCHER_JS, [PARTICIPANT_BUTTON_SELECTOR, PARTICIPANT_CHECK_MS, PARTICIPANT_MISSING_CHECKS])
+            await wait_for_meeting_end(page, leave_button, meeting_over, max_duration)
+
+            if button_missing:
+                await page.screenshot(path="debug_participant_timeout.png")
+                print("📸 Screenshot saved to debug_participant_timeout.png.")
+
+                # --- CHANGE 2: Save the page HTML for definitive debugging ---
                 try:
-                    # --- CHANGE 1: Using a much more robust, multi-attribute selector ---
-                    participant_button_locator = page.locator(
-                        'button[aria-label*="Show everyone"], button[aria-label*="Participants"], button[aria-label*="People"],'
-                        'button[data-tooltip*="Show everyone"], button[data-tooltip*="Participants"], button[data-tooltip*="People"]'
-                    ).first
-
-                    await participant_button_locator.wait_for(state="visible", timeout=5000)
-
-                    # Try to get aria-label first, fall back to data-tooltip
-                    count_text = await participant_button_locator.get_attribute("aria-label") or await participant_button_locator.get_attribute("data-tooltip")
-
-                    print(f"DEBUG: Raw attribute text: '{count_text}'")
-
-                    match = re.search(r'\d+', count_text)
-                    if match:
-                        participant_count = int(match.group())
-                        print(f"✅ Successfully parsed participant count: [{participant_count}]")
-                        if participant_count <= 1:
-                            print("Only 1 participant left. Ending the recording.")
-                            break
-                    else:
-                        print(f"❌ Could not parse participant count from text: '{count_text}'")
-                        break
-
-                except TimeoutError:
-                    print("Could not find participant count button. Assuming meeting has ended.")
-                    await page.screenshot(path="debug_participant_timeout.png")
-                    print("📸 Screenshot saved to debug_participant_timeout.png.")
-
-                    # --- CHANGE 2: Save the page HTML for definitive debugging ---
-                    try:
-                        html_content = await page.content()
-                        with open("debug_page_content.html", "w", encoding="utf-8") as f:
-                            f.write(html_content)
-                        print("📄 Saved page HTML to debug_page_content.html for analysis.")
-                    except Exception as html_error:
-                        print(f"Could not save page HTML: {html_error}")
-                    
-                    break # Exit the loop after failure
-                except Exception as e:
-                    print(f"An unexpected error occurred while checking participants: {e}")
-                    await page.screenshot(path="debug_participant_unexpected_error.png")
-                    print("📸 Screenshot saved to debug_participant_unexpected_error.png.")
-                    break
+                    html_content = await page.content()
+                    with open("debug_page_content.html", "w", encoding="utf-8") as f:
+                        f.write(html_content)
+                    print("📄 Saved page HTML to debug_page_content.html for analysis.")
+                except Exception as html_error:
+                    print(f"Could not save page HTML: {html_error}")
         except Exception as e:
-            print(f"An error occurred during setup or joining: {e}")
-            await page.screenshot(path="debug_setup_error.png")
-            print("📸 Screenshot saved to debug_setup_error.png.")
-        finally:
-            print("Cleaning up...")
-            if recorder and recorder.poll() is None:
+            print(f"An unexpected error occurred while checking participants: {e}")
+            await page.screenshot(path="debug_participant_unexpected_error.png")
+            print("📸 Screenshot saved to debug_participant_unexpected_error.png.")
+    except Exception as e:
+        print(f"An error occurred during setup or joining: {e}")
+        await page.screenshot(path="debug_setup_error.png")
+        print("📸 Screenshot saved to debug_setup_error.png.")
+    finally:
+        print("Cleaning up...")
+        if recorder:
+            if recorder.returncode is None:
                 print("Stopping the recording...")
-                recorder.terminate()
-                stdout, stderr = recorder.communicate()
-                if os.path.exists(OUTPUT_FILENAME) and os.path.getsize(OUTPUT_FILENAME) > 0:
-                    print(f"✅ Audio recording successful. File saved to {OUTPUT_FILENAME}")
-                    transcribe_audio(OUTPUT_FILENAME)
+                await stop_recorder(recorder)
+            await recorder.wait()
+            recorder_log.close()
+
+        # Leave the call before waiting on WhisperX, so the bot does not linger while the last segments upload.
+        try:
+            print("Attempting to hang up...")
+            await leave_button.click(timeout=5000)
+            print("✅ Clicked the 'Leave call' button.")
+            await asyncio.sleep(3)
+        except Exception as e:
+            print(f"Could not click hang up button, may have already left: {e}")
+        try:
+            await page.close()
+        except Exception as e:
+            print(f"Could not close the meeting page: {e}")
+
+        if recorder:
+            segments = [path for path in list_segments() if os.path.getsize(path) > 0]
+            if segments:
+                print(f"✅ Audio recording successful. {len(segments)} segment(s) saved as {OUTPUT_GLOB}")
+                print("Waiting for the remaining segments to be transcribed...")
+                transcripts = await transcriber
+                if transcripts:
+                    save_transcript(transcripts, transcript_path)
                 else:
-                    print(f"❌ Recording failed or was empty.\n--- FFmpeg Error Output ---\n{stderr.decode('utf-8', 'ignore')}\n-----------------------------")
+                    print(f"❌ No transcript produced: every segment was silent or failed in WhisperX. {transcript_path} was not written.")
+            else:
+                transcriber.cancel()
+                with open(FFMPEG_LOG_FILENAME, encoding="utf-8", errors="ignore") as f:
+                    ffmpeg_errors = f.read()
+                print(f"❌ Recording failed or was empty.\n--- FFmpeg Error Output ---\n{ffmpeg_errors}\n-----------------------------")
+
+async def main(urls, max_duration):
+    # Meetings run one after another: each one records the shared default audio source.
+    try:
+        for meeting_number, url in enumerate(urls, start=1):
+            try:
+                await join_and_record_meeting(url, max_duration, transcript_filename(meeting_number))
+            except Exception as e:
+                print(f"❌ Meeting {url} failed: {e}")
+    finally:
+        await close_pool()
+
+async def serve(socket_path, max_duration):
+    """Keeps one browser running and joins every meeting URL sent to the Unix socket."""
+    meeting_slots = asyncio.Semaphore(MAX_CONCURRENT_MEETINGS)
+    meetings = set()
+    meeting_number = 0
 
+    async def run_meeting(url, number):
+        async with meeting_slots:
             try:
-                print("Attempting to hang up...")
-                hang_up_button = page.get_by_role("button", name="Leave call")
-                await hang_up_button.click(timeout=5000)
-                print("✅ Clicked the 'Leave call' button.")
-                await asyncio.sleep(3)
+                await join_and_record_meeting(url, max_duration, transcript_filename(number))
             except Exception as e:
-                print(f"Could not click hang up button, may have already left: {e}")
+                print(f"❌ Meeting {number} ({url}) failed: {e}")
 
-            await browser.close()
-            print("Browser closed.")
+    async def handle_client(reader, writer):
+        nonlocal meeting_number
+        # One meeting URL per line, until the client closes its side of the connection.
+        async for line in reader:
+            url = line.decode().strip()
+            if not url:
+                continue
+            meeting_number += 1
+            task = asyncio.create_task(run_meeting(url, meeting_number))
+            meetings.add(task)
+            task.add_done_callback(meetings.discard)
+            writer.write(f"Queued meeting {meeting_number}: {url}\n".encode())
+            await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+
+    await get_pool()
+    os.makedirs(os.path.dirname(socket_path), mode=0o700, exist_ok=True)
+    # Create the socket owner-only from the start rather than chmod-ing it after others could connect.
+    old_umask = os.umask(0o177)
+    try:
+        server = await asyncio.start_unix_server(handle_client, path=socket_path)
+    finally:
+        os.umask(old_umask)
+    os.chmod(socket_path, 0o600)
+    print(f"Listening for meeting URLs on {socket_path}...")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await close_pool()
+
+async def submit_to_server(socket_path, urls):
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    writer.write("".join(f"{url}\n" for url in urls).encode())
+    await writer.drain()
+    writer.write_eof()
+    async for line in reader:
+        print(line.decode().strip())
+    writer.close()
+    await writer.wait_closed()
+
+async def run_cli(urls, max_duration):
+    # Hand the URLs to a running bot daemon if there is one, otherwise join the meetings from this process.
+    try:
+        await submit_to_server(SOCKET_PATH, urls)
+    except (FileNotFoundError, ConnectionRefusedError):
+        await main(urls, max_duration)
 
 if __name__ == "__main__":
-    if not MEETING_URL:
-        print("Error: Please provide a meeting URL as a command-line argument.")
+    if MEETING_URLS == ["--serve"]:
+        asyncio.run(serve(SOCKET_PATH, MAX_MEETING_DURATION_SECONDS))
+        sys.exit(0)
+    if not MEETING_URLS:
+        print("Error: Please provide one or more meeting URLs as command-line arguments, or --serve to start the bot daemon.")
         sys.exit(1)
-    asyncio.run(join_and_record_meeting(MEETING_URL, MAX_MEETING_DURATION_SECONDS))
+    asyncio.run(run_cli(MEETING_URLS, MAX_MEETING_DURATION_SECONDS))